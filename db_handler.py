@@ -68,10 +68,43 @@ def build_where_from_filters(filters: Dict[str, Any]) -> Tuple[str, Dict[str, An
 
     return where_sql, params
 
+# 기간 단위 자동 상향 기준 (해당 단위의 기간 수가 한도를 넘으면 다음 단위로 재집계)
+COARSER_GRAIN = {"day": "month", "month": "year"}
+MAX_PERIODS_BY_GRAIN = {"day": 731, "month": 240}  # 일: 약 2년, 월: 20년
+
+
+def _count_periods(db: sqlite3.Connection, p_col: str, time_grain: str,
+                   where_sql: str, params: Dict[str, Any]) -> int:
+    """집계 전에 해당 단위의 기간 수만 가볍게 조회합니다. (기간 단위 상향 판단용)"""
+    sql = f"SELECT COUNT(DISTINCT {period_expr(p_col, time_grain)}) FROM subscription {where_sql}"
+    return db.execute(sql, params).fetchone()[0]
+
+
+def _fetch_period_rows(db: sqlite3.Connection, p_col: str, time_grain: str, g_col: Optional[str],
+                       val_expr: str, where_sql: str, params: Dict[str, Any]) -> List[sqlite3.Row]:
+    """기간(및 그룹)별 집계 SQL을 조립/실행하고 결과 행을 반환합니다."""
+    time_label = period_expr(p_col, time_grain)
+
+    if g_col:
+        sql = f"SELECT {time_label} as period, {g_col} as grp, {val_expr} as val FROM subscription {where_sql} GROUP BY period, grp ORDER BY period"
+    else:
+        sql = f"SELECT {time_label} as period, 'Total' as grp, {val_expr} as val FROM subscription {where_sql} GROUP BY period ORDER BY period"
+
+    # --- [쿼리 로그 확인] ---
+    print(f"==== [EXECUTING SQL] ====\n{sql}")
+    print(f"==== [PARAMETERS] ====\n{params}\n" + "="*25)
+
+    cur = db.execute(sql, params)
+    return cur.fetchall()
+
 #
-def query_db_with_spec_ipit(spec: Dict[str, Any], db: sqlite3.Connection) -> Dict[str, Any]:
+def query_db_with_spec_ipit(spec: Dict[str, Any], db: sqlite3.Connection,
+                            auto_coarsen: bool = True, max_points: int = 0) -> Dict[str, Any]:
     """
     GPT 스펙을 바탕으로 요청하신 신규/해지/순증 로직을 적용하여 쿼리하고 결과를 반환합니다.
+    auto_coarsen=True이면 기간 수가 너무 많을 때 time_grain을 자동으로 상향하며,
+    bar/pie 차트는 기간 수가 max_points(차트 포인트 예산)를 넘어도 상향합니다.
+    적용 여부는 결과의 "reduction" 항목에 기록됩니다.
     """
     metric = spec.get("metric", "new_cnt")
     time_grain = spec.get("time_grain", "month")
@@ -120,7 +153,6 @@ def query_db_with_spec_ipit(spec: Dict[str, Any], db: sqlite3.Connection) -> Dic
         p_col = "svc_open_dh"
 
     # --- [SQL 쿼리 조립] ---
-    time_label = period_expr(p_col, time_grain)
     where_sql, params = build_where_from_filters(filters)
 
     # --- [추가: 기간 필터 강제 적용 로직] ---
@@ -137,37 +169,55 @@ def query_db_with_spec_ipit(spec: Dict[str, Any], db: sqlite3.Connection) -> Dic
 
     g_col = group_expr(group_by)
 
-    if g_col:
-        sql = f"SELECT {time_label} as period, {g_col} as grp, {val_expr} as val FROM subscription {where_sql} GROUP BY period, grp ORDER BY period"
-    else:
-        sql = f"SELECT {time_label} as period, 'Total' as grp, {val_expr} as val FROM subscription {where_sql} GROUP BY period ORDER BY period"
-
-
-    # --- [쿼리 로그 확인] ---
-    print(f"==== [EXECUTING SQL] ====\n{sql}")
-    print(f"==== [PARAMETERS] ====\n{params}\n" + "="*25)
+    chart_type = spec.get("chart_type", "line")
+
+    # --- [기간 단위 자동 상향] ---
+    # 일 단위로 수년치를 조회하면 라벨이 수천 개가 되어 차트 렌더링이 멈추므로
+    # 집계 전에 기간 수만 세어 보고, 한도를 넘으면 한 단계 큰 단위(일 → 월 → 연)로 집계합니다.
+    # bar/pie는 일부 기간만 골라 그릴 수 없으므로 포인트 예산도 한도로 사용합니다.
+    requested_grain = time_grain
+    if auto_coarsen:
+        while time_grain in COARSER_GRAIN:
+            limit = MAX_PERIODS_BY_GRAIN[time_grain]
+            if chart_type in ("bar", "pie") and max_points > 0:
+                limit = min(limit, max_points)
+            if _count_periods(db, p_col, time_grain, where_sql, params) <= limit:
+                break
+            time_grain = COARSER_GRAIN[time_grain]
 
     # --- [실행 및 결과 가공] ---
-    cur = db.execute(sql, params)
-    rows = cur.fetchall()
+    rows = _fetch_period_rows(db, p_col, time_grain, g_col, val_expr, where_sql, params)
 
     # Chart.js가 이해할 수 있는 구조로 변환
     periods = sorted(list(set(r['period'] for r in rows)))
     groups = sorted(list(set(r['grp'] for r in rows)))
 
+    # (기간, 그룹) 조회용 인덱스 - 기간이 길어져도 행 전체를 반복 탐색하지 않도록 함
+    val_map = {(r['period'], r['grp']): r['val'] for r in rows}
+
     datasets = []
 
     for g in groups:
-        data_points = []
-        for p in periods:
-            # 해당 기간/그룹에 맞는 값을 찾고 없으면 0
-            val = next((r['val'] for r in rows if r['period'] == p and r['grp'] == g), 0)
-            data_points.append(val)
+        # 해당 기간/그룹에 맞는 값을 찾고 없으면 0
+        data_points = [val_map.get((p, g), 0) for p in periods]
         datasets.append({"label": str(g), "data": data_points})
 
     return {
-        "chart_type": spec.get("chart_type", "line"),
+        "chart_type": chart_type,
         "labels": periods,
         "datasets": datasets,
-        "table": [dict(r) for r in rows] # 표 형식 데이터 병행 제공
+        "table": [dict(r) for r in rows], # 표 형식 데이터 병행 제공
+        # 축소 내역 - 다운샘플링 항목은 utils.downsample_result_ipit에서 갱신 (미적용 시 기본값 유지)
+        "reduction": {
+            "requested_time_grain": requested_grain,
+            "time_grain": time_grain,
+            "grain_coarsened": time_grain != requested_grain,
+            "method": None,
+            "max_points": max_points,
+            "original_points": len(periods),
+            "returned_points": len(periods),
+            "bucket_width": None,
+            "partial_last_bucket": False,
+            "downsampled": False,
+        },
     }
@@ -18,12 +18,13 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from fastapi import FastAPI, Depends, HTTPException
 from pydantic import BaseModel
+from typing import Any, Dict, Optional
 import sqlite3
 
 # 앞서 분리한 커스텀 모듈 임포트
 from gpt_engine import ask_gpt_for_spec, generate_commentary_ipit
 from db_handler import query_db_with_spec_ipit
-from utils import preprocess_question, summarize_result_for_ai_ipit
+from utils import preprocess_question, summarize_result_for_ai_ipit, downsample_result_ipit
 from fastapi.staticfiles import StaticFiles
 
 app = FastAPI(title="IPIT 가입자 상태 분석 시스템 API")
@@ -43,6 +44,9 @@ app.add_middleware(
 # DB 경로 설정 (환경변수 혹은 기본값)
 DB_PATH = os.getenv("IPIT_DB_PATH", os.path.join(BASE_DIR, "DB", "subscriptions.db"))
 
+# 차트 최대 포인트(라벨) 수 (초과 시 서버에서 다운샘플링, 0 이하이면 비활성화)
+MAX_CHART_POINTS = int(os.getenv("IPIT_MAX_CHART_POINTS", "500"))
+
 
 # ======================
 # DB 연결 의존성
@@ -64,7 +68,10 @@ def get_db():
 # API 요청 모델
 # ======================
 class AskRequest(BaseModel):
-    question: str
+    question: str = ""
+    # 이전 응답의 spec을 그대로 보내면 GPT 호출 없이 같은 조건으로 재조회 (전체 해상도 재요청용)
+    spec: Optional[Dict[str, Any]] = None
+    full_resolution: bool = False  # True이면 기간 단위 상향/다운샘플링 없이 원본 해상도(표 데이터 포함)로 반환
 
 
 # ======================
@@ -74,29 +81,38 @@ class AskRequest(BaseModel):
 def ask_api(body: AskRequest, db: sqlite3.Connection = Depends(get_db)):
     question_raw = body.question.strip()
 
-    if not question_raw:
+    if not question_raw and not body.spec:
         raise HTTPException(status_code=400, detail="질문을 입력해주세요.")
 
+    # 축소 예산 (0이면 다운샘플링 미적용)
+    max_points = 0 if body.full_resolution else MAX_CHART_POINTS
+
     try:
-        # 1) 자연어 전처리 (utils.py)
-        # "올해", "작년" 등의 키워드를 분석하여 연도 힌트 추출
-        processed_q, year_hint = preprocess_question(question_raw)
+        if body.spec:
+            # 이미 해석된 스펙으로 재조회 - GPT 스펙 생성/해설 생략
+            spec = body.spec
+        else:
+            # 1) 자연어 전처리 (utils.py)
+            # "올해", "작년" 등의 키워드를 분석하여 연도 힌트 추출
+            processed_q, year_hint = preprocess_question(question_raw)
 
-        # 2) GPT를 이용한 쿼리 스펙 생성 (gpt_engine.py)
-        # 질문을 분석하여 metric, group_by, filters 등의 JSON 객체 반환
-        spec = ask_gpt_for_spec(processed_q)
+            # 2) GPT를 이용한 쿼리 스펙 생성 (gpt_engine.py)
+            # 질문을 분석하여 metric, group_by, filters 등의 JSON 객체 반환
+            spec = ask_gpt_for_spec(processed_q)
 
-        # 전처리에서 추출된 연도 정보가 있다면 스펙에 강제 반영
-        if year_hint:
-            spec["year"] = year_hint
+            # 전처리에서 추출된 연도 정보가 있다면 스펙에 강제 반영
+            if year_hint:
+                spec["year"] = year_hint
 
         # 3) DB 조회 및 데이터 가공 (db_handler.py)
         # 요청하신 '신규/해지/순증' 로직이 반영된 SQL 실행
-        result = query_db_with_spec_ipit(spec, db)
+        result = query_db_with_spec_ipit(spec, db, auto_coarsen=not body.full_resolution, max_points=max_points)
 
         # 4) 분석 결과에 대한 AI 해설 생성
-        # 데이터가 존재할 경우에만 요약본을 만들어 GPT에게 전달
-        if result.get("table") and len(result["table"]) > 0:
+        # 데이터가 존재할 경우에만 요약본을 만들어 GPT에게 전달 (스펙 재조회 시에는 기존 해설 유지)
+        if body.spec:
+            result["analysis"] = None
+        elif result.get("table") and len(result["table"]) > 0:
             summary_text = summarize_result_for_ai_ipit(spec, result)
 
             # commentary = generate_commentary_ipit(question_raw, summary_text) # gpt_engine.py에서 summary param 인식 불가
@@ -105,6 +121,16 @@ def ask_api(body: AskRequest, db: sqlite3.Connection = Depends(get_db)):
         else:
             result["analysis"] = "조회된 데이터가 없어 분석 내용을 생성할 수 없습니다."
 
+        # 5) 차트 데이터 다운샘플링
+        # 해설용 통계는 위에서 원본 해상도로 계산하고, 브라우저로 보내는 시계열만 축소
+        # 표 데이터는 화면에서 쓰지 않으므로 전체 해상도 요청 시에만 포함
+        result = downsample_result_ipit(result, max_points)
+        if not body.full_resolution:
+            result.pop("table", None)
+
+        # 전체 해상도 재조회에 사용할 수 있도록 해석된 스펙 반환
+        result["spec"] = spec
+
         return result
 
     except Exception as e:
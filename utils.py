@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import math
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 
@@ -47,6 +48,9 @@ def summarize_result_for_ai_ipit(spec: Dict[str, Any], result: Dict[str, Any]) -
     summary_lines.append(f"### [데이터 분석 요약 보고서]")
     summary_lines.append(f"- 분석 지표: {metric}")
     summary_lines.append(f"- 분석 기간: {labels[0]} ~ {labels[-1]}")
+    reduction = result.get("reduction", {})
+    if reduction.get("grain_coarsened"):
+        summary_lines.append(f"- 집계 단위: 조회 기간이 길어 {reduction['requested_time_grain']} 단위 대신 {reduction['time_grain']} 단위로 집계")
     summary_lines.append("-" * 30)
 
     for ds in datasets:
@@ -83,4 +87,97 @@ def summarize_result_for_ai_ipit(spec: Dict[str, Any], result: Dict[str, Any]) -
                 summary_lines.append(f"   * 직전 대비 추세: {trend}")
             summary_lines.append("")
 
-    return "\n".join(summary_lines)
\ No newline at end of file
+    return "\n".join(summary_lines)
+
+def _bucket_minmax(values: List[Optional[float]]) -> List[Optional[float]]:
+    """버킷 내 최소/최대값을 발생 순서대로 반환합니다. (모두 결측이면 [None, None])"""
+    valid = [(j, v) for j, v in enumerate(values) if v is not None]
+    if not valid:
+        return [None, None]
+    lo = min(valid, key=lambda x: x[1])
+    hi = max(valid, key=lambda x: x[1])
+    return [lo[1], hi[1]] if lo[0] <= hi[0] else [hi[1], lo[1]]
+
+
+def _bucket_sum(values: List[Optional[float]]) -> Optional[float]:
+    """버킷 내 값의 합계 (모두 결측이면 None)"""
+    valid = [v for v in values if v is not None]
+    return sum(valid) if valid else None
+
+
+def downsample_result_ipit(result: Dict[str, Any], max_points: int) -> Dict[str, Any]:
+    """
+    차트용 결과를 max_points 개 이내의 라벨로 줄입니다. (max_points <= 0 이면 축소하지 않음)
+    모든 데이터셋이 같은 고정 폭 버킷을 공유하므로 라벨이 일정 간격을 유지하고,
+    Chart.js의 category 축에서도 기간 간격이 왜곡되지 않습니다.
+    - line: 버킷마다 두 칸(버킷 시작/중간 시점)에 데이터셋별 최소·최대값을 발생 순서대로 배치 (minmax)
+    - bar/pie: 버킷 내 합계 (sum). 보통은 db_handler에서 기간 단위가 먼저 상향되므로
+      연 단위로도 예산을 넘는 경우에만 적용되며, 폭이 짧은 마지막 버킷은 부분 구간으로 표시합니다.
+    축소 내역은 result["reduction"]에 기록하며 표(table) 데이터는 건드리지 않습니다.
+    """
+    labels = result.get("labels", [])
+    datasets = result.get("datasets", [])
+    reduction = result.setdefault("reduction", {})
+    reduction.update({
+        "method": None,
+        "max_points": max_points,
+        "original_points": len(labels),
+        "returned_points": len(labels),
+        "bucket_width": None,
+        "partial_last_bucket": False,
+        "downsampled": False,
+    })
+
+    n = len(labels)
+    if max_points <= 0 or n <= max_points:
+        return result
+
+    is_line = result.get("chart_type", "line") not in ("bar", "pie")
+    if is_line and max_points < 2:
+        # 최소·최대 한 쌍은 표시해야 하므로 line 예산은 최소 2
+        max_points = reduction["max_points"] = 2
+        if n <= max_points:
+            return result
+    # line은 버킷당 2칸을 사용하므로 버킷 수는 예산의 절반 (최소 1개)
+    n_buckets = max(max_points // 2, 1) if is_line else max_points
+    width = math.ceil(n / n_buckets)
+    if is_line and width % 2:
+        # 두 칸(시작/중간 시점)이 정확히 width/2 간격이 되도록 짝수 폭 사용
+        width += 1
+    bounds = [(s, min(s + width, n)) for s in range(0, n, width)]
+    partial = bounds[-1][1] - bounds[-1][0] < width
+
+    if is_line:
+        new_labels = []
+        for s, e in bounds:
+            new_labels.append(labels[s])
+            if e - s > 1:
+                new_labels.append(labels[min(s + width // 2, e - 1)])
+        for ds in datasets:
+            data = ds.get("data", [])
+            points = []
+            for s, e in bounds:
+                pair = _bucket_minmax(data[s:e])
+                points.extend(pair if e - s > 1 else pair[:1])
+            ds["data"] = points
+        method = "minmax"
+    else:
+        new_labels = [
+            labels[s] if e - s == 1 else f"{labels[s]} ~ {labels[e - 1]}" for s, e in bounds
+        ]
+        if partial:
+            new_labels[-1] = f"{new_labels[-1]} (부분 구간)"
+        for ds in datasets:
+            data = ds.get("data", [])
+            ds["data"] = [_bucket_sum(data[s:e]) for s, e in bounds]
+        method = "sum"
+
+    result["labels"] = new_labels
+    reduction.update({
+        "method": method,
+        "returned_points": len(new_labels),
+        "bucket_width": width,
+        "partial_last_bucket": partial,
+        "downsampled": True,
+    })
+    return result